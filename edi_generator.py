@@ -30,6 +30,8 @@ import argparse
 import os
 import random
 import string
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
 
@@ -37,42 +39,69 @@ from datetime import datetime, timedelta
 # Helpers
 # ---------------------------------------------------------------------------
 
-def pad(value, length, fill=" "):
-    """Pad a string to a fixed length (left-aligned)."""
-    return str(value)[:length].ljust(length, fill)
+ALPHANUMERIC = string.ascii_uppercase + string.digits
 
+# POW10[k] == 10**k for the digit widths the generators use; wider widths
+# fall back to computing the power
+POW10 = [10**k for k in range(21)]
 
-def control_number(digits=9):
+# Random date offsets are built as DAY * n rather than timedelta(days=n)
+DAY = timedelta(days=1)
+
+# Random helpers take an optional ``rng`` (a random.Random); by default they
+# draw from the module-level generator.
+
+
+def control_number(digits=9, rng=random):
     """Generate a zero-padded random control number."""
-    return str(random.randint(1, 10**digits - 1)).zfill(digits)
+    limit = POW10[digits] if digits < len(POW10) else 10**digits
+    return f"{rng.randint(1, limit - 1):0{digits}d}"
+
+
+def digit_string(k, rng=random):
+    """Generate a random string of exactly ``k`` decimal digits."""
+    limit = POW10[k] if k < len(POW10) else 10**k
+    return f"{rng.randrange(limit):0{k}d}"
 
 
 def date_str(dt=None, fmt="%Y%m%d"):
-    return (dt or datetime.now()).strftime(fmt)
+    dt = dt or datetime.now()
+    if fmt == "%Y%m%d":
+        # Spelled out: strftime re-parses the format on every call
+        return f"{dt.year:04d}{dt.month:02d}{dt.day:02d}"
+    return dt.strftime(fmt)
 
 
 def time_str(dt=None, fmt="%H%M"):
-    return (dt or datetime.now()).strftime(fmt)
+    dt = dt or datetime.now()
+    if fmt == "%H%M":
+        return f"{dt.hour:02d}{dt.minute:02d}"
+    return dt.strftime(fmt)
 
 
-def npi():
+def npi(rng=random):
     """Generate a random 10-digit NPI (National Provider Identifier)."""
-    return "1" + "".join(random.choices(string.digits, k=9))
+    return "1" + digit_string(9, rng)
 
 
-def member_id():
+def member_id(rng=random):
     """Generate a random member/subscriber ID."""
-    return "".join(random.choices(string.ascii_uppercase, k=3)) + "".join(random.choices(string.digits, k=9))
+    return "".join(rng.choices(string.ascii_uppercase, k=3)) + digit_string(9, rng)
+
 
+def phone(area="555", rng=random):
+    """Generate a 10-digit phone number with the given area code."""
+    return area + str(rng.randrange(1000000, 10000000))
 
-def claim_id():
+
+def claim_id(rng=random):
     """Generate a random claim control number."""
-    return "".join(random.choices(string.digits, k=12))
+    return digit_string(12, rng)
 
 
-def tax_id():
+def tax_id(rng=random):
     """Generate a random 9-digit tax ID (EIN)."""
-    return "".join(random.choices(string.digits, k=9))
+    return digit_string(9, rng)
 
 
 # ---------------------------------------------------------------------------
@@ -148,7 +177,7 @@ FIRST_NAMES_F = [
 MIDDLE_INITIALS = list(string.ascii_uppercase)
 
 
-def random_patient():
+def random_patient(rng=random):
     """Generate a random patient with unique name, gender, and DOB.
 
     Returns a tuple: (last, first, middle_initial, gender, dob_str)
@@ -157,14 +186,15 @@ def random_patient():
     With 50 last × 30 first × 26 middle = 39,000 unique combos per gender,
     this scales to thousands of claims without significant collision.
     """
-    gender = random.choice(("M", "F"))
-    first = random.choice(FIRST_NAMES_M if gender == "M" else FIRST_NAMES_F)
-    last = random.choice(LAST_NAMES)
-    middle = random.choice(MIDDLE_INITIALS)
+    choice, randint = rng.choice, rng.randint
+    gender = choice(("M", "F"))
+    first = choice(FIRST_NAMES_M if gender == "M" else FIRST_NAMES_F)
+    last = choice(LAST_NAMES)
+    middle = choice(MIDDLE_INITIALS)
     # Random DOB between 1955 and 2000
-    year = random.randint(1955, 2000)
-    month = random.randint(1, 12)
-    day = random.randint(1, 28)  # 28 avoids month-length edge cases
+    year = randint(1955, 2000)
+    month = randint(1, 12)
+    day = randint(1, 28)  # 28 avoids month-length edge cases
     dob = f"{year}{month:02d}{day:02d}"
     return (last, first, middle, gender, dob)
 
@@ -197,15 +227,16 @@ CITIES_STATES_ZIPS = [
 ]
 
 
-def random_address():
+def random_address(rng=random):
     """Generate a random street address.
 
     Returns a tuple: (street, city, state, zip) matching the old ADDRESSES shape.
     30 street names × 10 types × 999 numbers × 30 cities = millions of combos.
     """
-    num = random.randint(100, 9999)
-    street = f"{num} {random.choice(STREET_NAMES)} {random.choice(STREET_TYPES)}"
-    city, state, zip_code = random.choice(CITIES_STATES_ZIPS)
+    choice = rng.choice
+    num = rng.randint(100, 9999)
+    street = f"{num} {choice(STREET_NAMES)} {choice(STREET_TYPES)}"
+    city, state, zip_code = choice(CITIES_STATES_ZIPS)
     return (street, city, state, zip_code)
 
 # CPT / HCPCS codes common in workers' comp / managed care
@@ -273,6 +304,63 @@ AUTH_SERVICE_TYPES = [
     ("SG", "Surgery", "1"),
 ]
 
+# 270 service type codes to inquire about
+ELIGIBILITY_SERVICE_TYPES = [
+    "30",   # Health Benefit Plan Coverage
+    "1",    # Medical Care
+    "33",   # Chiropractic
+    "35",   # Dental Care
+    "47",   # Hospital
+    "86",   # Emergency Services
+    "88",   # Pharmacy
+    "98",   # Professional (Physician) Visit - Office
+    "AL",   # Vision (Optometry)
+    "MH",   # Mental Health
+    "UC",   # Urgent Care
+    "AJ",   # Alcoholism
+    "AK",   # Drug Addiction
+    "A6",   # Psychiatric
+]
+
+# 271 plan names
+PLAN_NAMES = [
+    "WC PREFERRED PLAN", "WORKERS COMP STANDARD",
+    "WC MANAGED CARE GOLD", "EMPLOYERS WC PLAN A",
+    "WC COMPREHENSIVE", "WC SELECT NETWORK",
+]
+
+# 271 benefit detail templates - service types and their typical benefit info
+BENEFIT_DETAILS = [
+    # (service_type_code, description, info_type, amount_qualifier, amount)
+    ("1",  "Medical Care",      "B", "27", None),   # copay varies
+    ("33", "Chiropractic",      "B", "27", None),
+    ("35", "Dental Care",       "B", "27", None),
+    ("47", "Hospital",          "B", "29", None),   # percentage
+    ("86", "Emergency",         "B", "27", None),
+    ("88", "Pharmacy",          "B", "27", None),
+    ("98", "Physician Visit",   "B", "27", None),
+    ("AL", "Vision",            "B", "27", None),
+    ("MH", "Mental Health",     "B", "27", None),
+    ("UC", "Urgent Care",       "B", "27", None),
+    ("A4", "Psychiatric",       "B", "27", None),
+    ("A6", "Psychotherapy",     "B", "27", None),
+    ("AJ", "Alcoholism",        "F", "",   None),   # deductible
+    ("AK", "Drug Addiction",    "F", "",   None),
+    ("PT", "Physical Therapy",  "B", "27", None),
+    ("OT", "Occupational Therapy", "B", "27", None),
+]
+
+# 271 benefit amounts, kept as strings since they are emitted verbatim
+COPAY_AMOUNTS = ["10", "15", "20", "25", "30", "35", "40", "50"]
+VISIT_LIMITS = ["12", "20", "24", "30", "36", "52", "60"]
+OOP_MAXIMUMS = ["2000", "3000", "4000", "5000", "6000"]
+DEDUCTIBLES = ["0", "250", "500", "750", "1000"]
+
+# 278 review types: HS=Health Services, SC=Specialty Care, AR=Admission Review
+REVIEW_TYPES = ["HS", "SC", "AR"]
+# Certification types: I=Initial, R=Renewal/Recertification, E=Extension
+CERT_TYPES = ["I", "I", "I", "R", "E"]
+
 
 # ---------------------------------------------------------------------------
 # Line of Business (LOB) profiles
@@ -312,7 +400,6 @@ LOB_PROFILES = {
             ("97162", "PT evaluation moderate complexity", 115.00),
             ("97163", "PT evaluation high complexity", 135.00),
             ("97113", "Aquatic therapy", 48.00),
-            ("97542", "Wheelchair management", 42.00),
             ("97750", "Physical performance test", 55.00),
             ("97799", "Physical therapy service", 50.00),
         ],
@@ -762,6 +849,63 @@ LOB_PROFILES = {
     },
 }
 
+
+def _preformat_procedures(codes):
+    """Append EDI-formatted fields to each (cpt, desc, price) entry.
+
+    Adds the ``.2f`` price string and the ``HC:<cpt>`` composite procedure
+    code. Both are static, so they are built once at import instead of on
+    every service line.
+    """
+    return [(cpt, desc, price, f"{price:.2f}", f"HC:{cpt}")
+            for cpt, desc, price in codes]
+
+
+def _preformat_diagnoses(codes):
+    """Append the HI composites to each (code, desc) entry.
+
+    The first diagnosis on a claim is sent as ``BK:<code>`` (principal) and
+    the rest as ``BF:<code>``; both forms are built once at import.
+    """
+    return [(code, desc, f"BK:{code}", f"BF:{code}") for code, desc in codes]
+
+
+def _preformat_places_of_service(codes):
+    """Append the CLM05 composite (``<pos>:B:1``) to each (code, name) entry."""
+    return [(code, name, f"{code}:B:1") for code, name in codes]
+
+
+PROCEDURE_CODES = _preformat_procedures(PROCEDURE_CODES)
+ICD10_CODES = _preformat_diagnoses(ICD10_CODES)
+PLACE_OF_SERVICE = _preformat_places_of_service(PLACE_OF_SERVICE)
+for _profile in LOB_PROFILES.values():
+    _profile["procedure_codes"] = _preformat_procedures(_profile["procedure_codes"])
+    _profile["icd10_codes"] = _preformat_diagnoses(_profile["icd10_codes"])
+    _profile["place_of_service"] = _preformat_places_of_service(
+        _profile["place_of_service"])
+del _profile
+
+# ISA/GS sender and receiver IDs: the party name without spaces, max 15 chars
+INTERCHANGE_IDS = {
+    name: name.replace(" ", "")[:15]
+    for name in [
+        *(payer[0] for payer in PAYER_NAMES),
+        *(mco[0] for mco in MANAGED_CARE_ORGS),
+        *FACILITY_NAMES,
+        *(facility for profile in LOB_PROFILES.values()
+          for facility in profile["facility_names"]),
+    ]
+}
+
+
+def interchange_id(name):
+    """Return the ISA/GS sender/receiver ID for a party name.
+
+    INTERCHANGE_IDS is only a cache of the built-in pools; names added or
+    swapped in after import are derived the same way on the fly.
+    """
+    return INTERCHANGE_IDS.get(name) or name.replace(" ", "")[:15]
+
 # Active data pools — overridden when --lob is specified
 active_procedure_codes = PROCEDURE_CODES
 active_provider_names = PROVIDER_NAMES
@@ -798,7 +942,11 @@ def apply_lob(lob_name):
 # ---------------------------------------------------------------------------
 
 class EDIBuilder:
-    """Builds an EDI X12 document with proper enveloping."""
+    """Builds an EDI X12 document with proper enveloping.
+
+    Segments are stored as raw ``(segment_id, *elements)`` tuples of strings
+    and only joined into text once, in ``render``.
+    """
 
     def __init__(self, element_sep="*", segment_term="~", sub_element_sep=":"):
         self.element_sep = element_sep
@@ -807,15 +955,41 @@ class EDIBuilder:
         self.segments = []
 
     def add(self, segment_id, *elements):
-        parts = [segment_id] + [str(e) for e in elements]
-        self.segments.append(self.element_sep.join(parts) + self.segment_term)
+        self.segments.append((segment_id, *map(str, elements)))
+
+    def _extend(self, segments):
+        """Append pre-built ``(segment_id, *elements)`` tuples in bulk.
+
+        Unlike add(), elements are not coerced: every element must already
+        be a str, since render() and write_to() join them as-is.
+        """
+        self.segments.extend(segments)
 
     def segment_count(self):
         return len(self.segments)
 
     def render(self, pretty=False):
-        sep = "\n" if pretty else ""
-        return sep.join(self.segments)
+        if not self.segments:
+            return ""
+        element_sep = self.element_sep
+        sep = self.segment_term + ("\n" if pretty else "")
+        body = sep.join([element_sep.join(seg) for seg in self.segments])
+        return body + self.segment_term
+
+    def write_to(self, stream, pretty=False, chunk_size=4096):
+        """Write the document to a binary stream, ``chunk_size`` segments at a time.
+
+        Produces the same text as ``render``, except that with ``pretty`` the
+        final segment is also followed by a newline. The whole document is
+        never held in memory as a single string.
+        """
+        element_sep = self.element_sep
+        term = self.segment_term + ("\n" if pretty else "")
+        segments = self.segments
+        for start in range(0, len(segments), chunk_size):
+            chunk = segments[start:start + chunk_size]
+            stream.write("".join([element_sep.join(seg) + term for seg in chunk])
+                         .encode("ascii"))
 
 
 # ---------------------------------------------------------------------------
@@ -832,174 +1006,177 @@ TXN_META = {
     "999":  ("FA", "999", "005010X231A1"),
 }
 
+# ISA02/ISA04 carry no authorization/security information
+ISA_BLANK_10 = " " * 10
+
 
 def build_envelope(builder, sender_id, receiver_id, txn_type,
-                   transaction_segments):
+                   transaction_segments, now=None, rng=random):
     """Wrap transaction segments in ISA/GS/ST ... SE/GE/IEA envelope."""
-    now = datetime.now()
-    isa_control = control_number(9)
-    gs_control = control_number(4)
-    st_control = control_number(4).zfill(4)
+    now = now or datetime.now()
+    ccyymmdd = date_str(now)
+    hhmm = time_str(now)
+    isa_control = control_number(9, rng)
+    gs_control = control_number(4, rng)
+    st_control = control_number(4, rng)
     func_code, st_id, gs_version = TXN_META[txn_type]
 
-    # ISA - Interchange Control Header
-    builder.add(
-        "ISA",
-        "00", pad("", 10),             # Auth info
-        "00", pad("", 10),             # Security info
-        "ZZ", pad(sender_id, 15),      # Sender
-        "ZZ", pad(receiver_id, 15),    # Receiver
-        date_str(now, "%y%m%d"),       # Date
-        time_str(now),                 # Time
-        "^",                           # Repetition separator (5010)
-        "00501",                       # ISA version (5010)
-        isa_control,                   # Control number
-        "0",                           # Ack requested
-        "T",                           # Usage indicator (T=Test)
-        builder.sub_element_sep,       # Sub-element separator
-    )
-
-    # GS - Functional Group Header
-    builder.add(
-        "GS",
-        func_code, sender_id, receiver_id,
-        date_str(now), time_str(now),
-        gs_control, "X", gs_version,
-    )
-
-    # ST - Transaction Set Header
-    builder.add("ST", st_id, st_control, gs_version)
+    # ISA/GS/ST - Headers, emitted together
+    builder._extend((
+        # ISA - Interchange Control Header
+        ("ISA",
+         "00", ISA_BLANK_10,              # Auth info
+         "00", ISA_BLANK_10,              # Security info
+         "ZZ", f"{sender_id:<15.15}",     # Sender
+         "ZZ", f"{receiver_id:<15.15}",   # Receiver
+         ccyymmdd[2:],                    # Date (YYMMDD)
+         hhmm,                            # Time
+         "^",                             # Repetition separator (5010)
+         "00501",                         # ISA version (5010)
+         isa_control,                     # Control number
+         "0",                             # Ack requested
+         "T",                             # Usage indicator (T=Test)
+         builder.sub_element_sep),        # Sub-element separator
+        # GS - Functional Group Header
+        ("GS",
+         func_code, sender_id, receiver_id,
+         ccyymmdd, hhmm,
+         gs_control, "X", gs_version),
+        # ST - Transaction Set Header
+        ("ST", st_id, st_control, gs_version),
+    ))
 
     # -- Transaction body --
-    for seg_id, *elements in transaction_segments:
-        builder.add(seg_id, *elements)
+    builder._extend(transaction_segments)
 
-    # SE - Transaction Set Trailer (ST + body segments + SE)
+    # SE/GE/IEA - Trailers, emitted together
+    # (SE count covers ST + body segments + SE)
     se_count = len(transaction_segments) + 2
-    builder.add("SE", str(se_count), st_control)
-
-    # GE - Functional Group Trailer
-    builder.add("GE", "1", gs_control)
-
-    # IEA - Interchange Control Trailer
-    builder.add("IEA", "1", isa_control)
+    builder._extend((
+        ("SE", str(se_count), st_control),     # Transaction Set Trailer
+        ("GE", "1", gs_control),               # Functional Group Trailer
+        ("IEA", "1", isa_control),             # Interchange Control Trailer
+    ))
 
 
 # ---------------------------------------------------------------------------
 # 837P — Health Care Claim (Professional)
 # ---------------------------------------------------------------------------
 
-def generate_837p(num_claims=None):
+def generate_837p(num_claims=None, now=None, rng=random):
     """Generate a professional health care claim (837P)."""
-    num_claims = num_claims or random.randint(3, 10)
+    choice, randint, sample = rng.choice, rng.randint, rng.sample
+    num_claims = num_claims or randint(3, 10)
+    now = now or datetime.now()
 
-    submitter_name = random.choice(active_facility_names)
-    payer_name, payer_id = random.choice(PAYER_NAMES)
-    mco = random.choice(MANAGED_CARE_ORGS)
+    submitter_name = choice(active_facility_names)
+    payer_name, payer_id = choice(PAYER_NAMES)
+    mco = choice(MANAGED_CARE_ORGS)
 
     segments = []
 
     # BHT - Beginning of Hierarchical Transaction
     segments.append(("BHT", "0019", "00",
-                     "".join(random.choices(string.digits, k=8)),
-                     date_str(), time_str(), "CH"))
+                     digit_string(8, rng),
+                     date_str(now), time_str(now), "CH"))
 
     # -- Loop 1000A: Submitter
     segments.append(("NM1", "41", "2", submitter_name, "", "", "", "", "46",
-                     "".join(random.choices(string.ascii_uppercase + string.digits, k=6))))
-    segments.append(("PER", "IC", "EDI DEPARTMENT", "TE",
-                     f"555{random.randint(1000000,9999999)}"))
+                     "".join(rng.choices(ALPHANUMERIC, k=6))))
+    segments.append(("PER", "IC", "EDI DEPARTMENT", "TE", phone(rng=rng)))
 
     # -- Loop 1000B: Receiver (payer / MCO)
     segments.append(("NM1", "40", "2", payer_name, "", "", "", "", "46", payer_id))
 
     # -- Billing Provider HL
-    billing_provider = random.choice(active_provider_names)
-    billing_npi = npi()
-    billing_tin = tax_id()
-    billing_addr = random_address()
+    billing_provider = choice(active_provider_names)
+    billing_npi = npi(rng)
+    billing_tin = tax_id(rng)
+    billing_addr = random_address(rng)
 
     hl_id = 1
-    segments.append(("HL", str(hl_id), "", "20", "1"))
-    segments.append(("PRV", "BI", "PXC", "207X00000X"))  # Taxonomy code
-
-    # NM1 - Billing Provider Name
-    segments.append(("NM1", "85", "1",
-                     billing_provider[0], billing_provider[1], billing_provider[2],
-                     "", "", "XX", billing_npi))
-    segments.append(("N3", billing_addr[0]))
-    segments.append(("N4", billing_addr[1], billing_addr[2], billing_addr[3]))
-    segments.append(("REF", "EI", billing_tin))
+    segments.extend((
+        ("HL", str(hl_id), "", "20", "1"),
+        ("PRV", "BI", "PXC", "207X00000X"),  # Taxonomy code
+        # NM1 - Billing Provider Name
+        ("NM1", "85", "1",
+         billing_provider[0], billing_provider[1], billing_provider[2],
+         "", "", "XX", billing_npi),
+        ("N3", billing_addr[0]),
+        ("N4", billing_addr[1], billing_addr[2], billing_addr[3]),
+        ("REF", "EI", billing_tin),
+    ))
+
+    # The active LOB pools (and their sizes) are fixed for the whole document
+    icd10_codes, procedure_codes = active_icd10_codes, active_procedure_codes
+    place_of_service = active_place_of_service
+    num_diag_codes = len(icd10_codes)
+    num_proc_codes = len(procedure_codes)
 
     for claim_num in range(num_claims):
-        patient = random_patient()
-        patient_member_id = member_id()
-        patient_addr = random_address()
-        pos_code, pos_name = random.choice(active_place_of_service)
+        patient = random_patient(rng)
+        patient_member_id = member_id(rng)
+        patient_addr = random_address(rng)
+        pos_code, pos_name, pos_composite = choice(place_of_service)
 
         # -- Subscriber HL
         hl_id += 1
         sub_hl = hl_id
-        segments.append(("HL", str(hl_id), "1", "22", "0"))
-        segments.append(("SBR", "P", "", "", "", "", "", "", "", "WC"))
-
-        # NM1 - Subscriber Name
-        segments.append(("NM1", "IL", "1",
-                         patient[0], patient[1], patient[2],
-                         "", "", "MI", patient_member_id))
-        segments.append(("N3", patient_addr[0]))
-        segments.append(("N4", patient_addr[1], patient_addr[2], patient_addr[3]))
-        segments.append(("DMG", "D8", patient[4], patient[3]))
-
-        # NM1 - Payer Name
-        segments.append(("NM1", "PR", "2", payer_name, "", "", "", "", "PI", payer_id))
+        segments.extend((
+            ("HL", str(hl_id), "1", "22", "0"),
+            ("SBR", "P", "", "", "", "", "", "", "", "WC"),
+            # NM1 - Subscriber Name
+            ("NM1", "IL", "1",
+             patient[0], patient[1], patient[2],
+             "", "", "MI", patient_member_id),
+            ("N3", patient_addr[0]),
+            ("N4", patient_addr[1], patient_addr[2], patient_addr[3]),
+            ("DMG", "D8", patient[4], patient[3]),
+            # NM1 - Payer Name
+            ("NM1", "PR", "2", payer_name, "", "", "", "", "PI", payer_id),
+        ))
 
         # -- Claim Loop (2300)
-        claim_ctrl = claim_id()
-        diag_codes = random.sample(active_icd10_codes,
-                                   min(random.randint(1, 3), len(active_icd10_codes)))
-        service_date = datetime.now() - timedelta(days=random.randint(1, 30))
-        total_charge = 0.0
+        claim_ctrl = claim_id(rng)
+        diag_codes = sample(icd10_codes, min(randint(1, 3), num_diag_codes))
+        service_date = date_str(now - DAY * randint(1, 30))
 
         # Select procedures
-        num_svc_lines = min(random.randint(1, 4), len(active_procedure_codes))
-        procedures = random.sample(active_procedure_codes, num_svc_lines)
-
-        for cpt, desc, price in procedures:
-            total_charge += price
+        num_svc_lines = min(randint(1, 4), num_proc_codes)
+        procedures = sample(procedure_codes, num_svc_lines)
+        total_charge = sum(p[2] for p in procedures)
 
         # CLM - Claim Information
         segments.append(("CLM", claim_ctrl, f"{total_charge:.2f}", "",
-                         "", f"{pos_code}:B:1", "Y", "A", "Y", "I"))
+                         "", pos_composite, "Y", "A", "Y", "I"))
 
         # DTP - Date of Service (statement dates)
-        segments.append(("DTP", "431", "D8", date_str(service_date)))
+        segments.append(("DTP", "431", "D8", service_date))
 
         # REF - Claim Identifiers
         segments.append(("REF", "D9", claim_ctrl))
 
         # Workers' comp specific - REF for WC claim number
-        wc_claim = "WC" + "".join(random.choices(string.digits, k=10))
+        wc_claim = "WC" + digit_string(10, rng)
         segments.append(("REF", "Y4", wc_claim))
 
         # HI - Diagnosis Codes
-        hi_elements = ["BK:" + diag_codes[0][0]]
-        for code, desc in diag_codes[1:]:
-            hi_elements.append("BF:" + code)
-        segments.append(("HI", *hi_elements))
+        segments.append(("HI", diag_codes[0][2], *[dx[3] for dx in diag_codes[1:]]))
 
         # -- Service Line Loop (2400)
-        for svc_idx, (cpt, desc, price) in enumerate(procedures, 1):
+        for svc_idx, (cpt, desc, price, price_str, hc_code) in enumerate(procedures, 1):
             qty = 1
-            segments.append(("LX", str(svc_idx)))
-            # SV1 - Professional Service
-            segments.append(("SV1", f"HC:{cpt}", f"{price:.2f}", "UN",
-                             str(qty), pos_code, "", str(svc_idx)))
-            # DTP - Date of Service
-            segments.append(("DTP", "472", "D8", date_str(service_date)))
-
-    sender_id = submitter_name.replace(" ", "")[:15]
-    receiver_id = payer_name.replace(" ", "")[:15]
+            segments.extend((
+                ("LX", str(svc_idx)),
+                # SV1 - Professional Service
+                ("SV1", hc_code, price_str, "UN",
+                 str(qty), pos_code, "", str(svc_idx)),
+                # DTP - Date of Service
+                ("DTP", "472", "D8", service_date),
+            ))
+
+    sender_id = interchange_id(submitter_name)
+    receiver_id = interchange_id(payer_name)
     return segments, sender_id, receiver_id
 
 
@@ -1007,58 +1184,58 @@ def generate_837p(num_claims=None):
 # 835 — Health Care Claim Payment / Remittance Advice
 # ---------------------------------------------------------------------------
 
-def generate_835(num_claims=None):
+def generate_835(num_claims=None, now=None, rng=random):
     """Generate a remittance advice (835)."""
-    num_claims = num_claims or random.randint(5, 15)
+    choice, randint, sample, uniform = (
+        rng.choice, rng.randint, rng.sample, rng.uniform)
+    num_claims = num_claims or randint(5, 15)
+    now = now or datetime.now()
 
-    payer_name, payer_id = random.choice(PAYER_NAMES)
-    payer_addr = random_address()
+    payer_name, payer_id = choice(PAYER_NAMES)
+    payer_addr = random_address(rng)
 
+    # BPR leads the transaction but carries the total of every claim, so
+    # it is built last and put in front of the other segments on return
     segments = []
-
-    # BPR - Financial Information
-    total_payment = 0.0  # will be updated after claims
-    check_num = "".join(random.choices(string.digits, k=8))
-    pay_date = datetime.now()
-
-    # placeholder — we'll compute actual total and build BPR first in list
-    bpr_idx = len(segments)
-    segments.append(None)  # placeholder
+    total_payment = 0.0
+    check_num = digit_string(8, rng)
+    pay_date = date_str(now)
 
     # TRN - Reassociation Trace Number
     segments.append(("TRN", "1", check_num, "1" + payer_id))
 
     # DTM - Production Date
-    segments.append(("DTM", "405", date_str(pay_date)))
+    segments.append(("DTM", "405", pay_date))
 
     # -- Loop 1000A: Payer Identification
     segments.append(("N1", "PR", payer_name))
     segments.append(("N3", payer_addr[0]))
     segments.append(("N4", payer_addr[1], payer_addr[2], payer_addr[3]))
     segments.append(("REF", "2U", payer_id))
-    segments.append(("PER", "BL", "CLAIMS DEPT", "TE",
-                     f"800{random.randint(1000000,9999999)}"))
+    segments.append(("PER", "BL", "CLAIMS DEPT", "TE", phone("800", rng)))
 
     # -- Loop 1000B: Payee (Provider)
-    payee_facility = random.choice(active_facility_names)
-    payee_npi = npi()
-    payee_addr = random_address()
+    payee_facility = choice(active_facility_names)
+    payee_npi = npi(rng)
+    payee_addr = random_address(rng)
     segments.append(("N1", "PE", payee_facility, "XX", payee_npi))
     segments.append(("N3", payee_addr[0]))
     segments.append(("N4", payee_addr[1], payee_addr[2], payee_addr[3]))
-    segments.append(("REF", "TJ", tax_id()))
+    segments.append(("REF", "TJ", tax_id(rng)))
 
     # -- Claims (Loop 2100/2110)
+    procedure_codes = active_procedure_codes
+    num_proc_codes = len(procedure_codes)
     for _ in range(num_claims):
-        patient = random_patient()
-        clm_ctrl = claim_id()
-        num_lines = min(random.randint(1, 3), len(active_procedure_codes))
-        procedures = random.sample(active_procedure_codes, num_lines)
-        service_date = pay_date - timedelta(days=random.randint(15, 60))
+        patient = random_patient(rng)
+        clm_ctrl = claim_id(rng)
+        num_lines = min(randint(1, 3), num_proc_codes)
+        procedures = sample(procedure_codes, num_lines)
+        service_date = now - DAY * randint(15, 60)
 
         # Compute charges and payments
         total_charged = sum(p[2] for p in procedures)
-        allowed = round(total_charged * random.uniform(0.65, 0.90), 2)
+        allowed = round(total_charged * uniform(0.65, 0.90), 2)
         adjustment = round(total_charged - allowed, 2)
         claim_payment = allowed
 
@@ -1068,68 +1245,73 @@ def generate_835(num_claims=None):
         # Status: 1=Processed as Primary, 2=Processed as Secondary
         segments.append(("CLP", clm_ctrl, "1", f"{total_charged:.2f}",
                          f"{claim_payment:.2f}", "", "WC",
-                         "".join(random.choices(string.digits, k=14)), "11"))
-
-        # CAS - Claim Adjustment (contractual obligation)
-        segments.append(("CAS", "CO", "45", f"{adjustment:.2f}"))
-
-        # NM1 - Patient Name
-        segments.append(("NM1", "QC", "1", patient[0], patient[1], patient[2],
-                         "", "", "MI", member_id()))
-
-        # DTM - Statement dates
-        segments.append(("DTM", "232", date_str(service_date)))
-        segments.append(("DTM", "233",
-                         date_str(service_date + timedelta(days=random.randint(0, 5)))))
+                         digit_string(14, rng), "11"))
+
+        service_date_str = date_str(service_date)
+        segments.extend((
+            # CAS - Claim Adjustment (contractual obligation)
+            ("CAS", "CO", "45", f"{adjustment:.2f}"),
+            # NM1 - Patient Name
+            ("NM1", "QC", "1", patient[0], patient[1], patient[2],
+             "", "", "MI", member_id(rng)),
+            # DTM - Statement dates
+            ("DTM", "232", service_date_str),
+            ("DTM", "233",
+             date_str(service_date + DAY * randint(0, 5))),
+        ))
 
         # -- SVC lines (Loop 2110)
-        for cpt, desc, charge in procedures:
-            paid = round(charge * (claim_payment / total_charged), 2)
+        # Each line is paid at the claim's overall paid/charged ratio
+        paid_ratio = claim_payment / total_charged
+        for cpt, desc, charge, charge_str, hc_code in procedures:
+            paid = round(charge * paid_ratio, 2)
+            paid_str = f"{paid:.2f}"
             line_adj = round(charge - paid, 2)
-            segments.append(("SVC", f"HC:{cpt}", f"{charge:.2f}",
-                             f"{paid:.2f}", "", "1"))
-            segments.append(("DTM", "472", date_str(service_date)))
+            segments.append(("SVC", hc_code, charge_str, paid_str, "", "1"))
+            segments.append(("DTM", "472", service_date_str))
             if line_adj > 0:
                 segments.append(("CAS", "CO", "45", f"{line_adj:.2f}"))
-            segments.append(("AMT", "B6", f"{paid:.2f}"))
+            segments.append(("AMT", "B6", paid_str))
 
     # PLB - Provider Level Balance (optional adjustment)
-    plb_adj = round(random.uniform(-5.0, 0), 2)
+    plb_adj = round(uniform(-5.0, 0), 2)
     if plb_adj != 0:
-        segments.append(("PLB", payee_npi, date_str(pay_date),
+        segments.append(("PLB", payee_npi, pay_date,
                          "CV:CP", f"{plb_adj:.2f}"))
         total_payment += plb_adj
 
-    # Now fill in BPR
-    segments[bpr_idx] = ("BPR", "C", f"{total_payment:.2f}", "C", "ACH", "CTX",
-                         "01", "999999992", "DA", "123456",
-                         "1" + payer_id, "", "01", "999988880", "DA",
-                         check_num, date_str(pay_date))
+    # BPR - Financial Information
+    bpr = ("BPR", "C", f"{total_payment:.2f}", "C", "ACH", "CTX",
+           "01", "999999992", "DA", "123456",
+           "1" + payer_id, "", "01", "999988880", "DA",
+           check_num, pay_date)
 
-    sender_id = payer_name.replace(" ", "")[:15]
-    receiver_id = payee_facility.replace(" ", "")[:15]
-    return segments, sender_id, receiver_id
+    sender_id = interchange_id(payer_name)
+    receiver_id = interchange_id(payee_facility)
+    return [bpr, *segments], sender_id, receiver_id
 
 
 # ---------------------------------------------------------------------------
 # 270 — Eligibility Inquiry
 # ---------------------------------------------------------------------------
 
-def generate_270(num_claims=None):
+def generate_270(num_claims=None, now=None, rng=random):
     """Generate eligibility inquiries (270) for multiple subscribers."""
-    num_subscribers = num_claims or random.randint(3, 10)
+    choice, randint, sample = rng.choice, rng.randint, rng.sample
+    num_subscribers = num_claims or randint(3, 10)
+    now = now or datetime.now()
 
-    payer_name, payer_id = random.choice(PAYER_NAMES)
-    facility = random.choice(active_facility_names)
-    provider_npi = npi()
+    payer_name, payer_id = choice(PAYER_NAMES)
+    facility = choice(active_facility_names)
+    provider_npi = npi(rng)
 
     segments = []
     hl_id = 0
 
     # BHT - Beginning of Hierarchical Transaction
     segments.append(("BHT", "0022", "13",
-                     "".join(random.choices(string.digits, k=8)),
-                     date_str(), time_str()))
+                     digit_string(8, rng),
+                     date_str(now), time_str(now)))
 
     # HL - Information Source (Payer)
     hl_id += 1
@@ -1142,47 +1324,29 @@ def generate_270(num_claims=None):
     provider_hl = hl_id
     segments.append(("HL", str(hl_id), str(payer_hl), "21", "1"))
     segments.append(("NM1", "1P", "2", facility, "", "", "", "", "XX", provider_npi))
-    segments.append(("REF", "EI", tax_id()))
-
-    # Service type codes to inquire about
-    service_type_pool = [
-        "30",   # Health Benefit Plan Coverage
-        "1",    # Medical Care
-        "33",   # Chiropractic
-        "35",   # Dental Care
-        "47",   # Hospital
-        "86",   # Emergency Services
-        "88",   # Pharmacy
-        "98",   # Professional (Physician) Visit - Office
-        "AL",   # Vision (Optometry)
-        "MH",   # Mental Health
-        "UC",   # Urgent Care
-        "AJ",   # Alcoholism
-        "AK",   # Drug Addiction
-        "A6",   # Psychiatric
-    ]
+    segments.append(("REF", "EI", tax_id(rng)))
 
     # Multiple subscriber inquiries
     for _ in range(num_subscribers):
-        patient = random_patient()
+        patient = random_patient(rng)
         hl_id += 1
 
         segments.append(("HL", str(hl_id), str(provider_hl), "22", "0"))
-        trace_num = "".join(random.choices(string.digits, k=12))
+        trace_num = digit_string(12, rng)
         segments.append(("TRN", "1", trace_num, "9" + payer_id))
         segments.append(("NM1", "IL", "1", patient[0], patient[1], patient[2],
-                         "", "", "MI", member_id()))
+                         "", "", "MI", member_id(rng)))
         segments.append(("DMG", "D8", patient[4]))
-        svc_date = datetime.now() - timedelta(days=random.randint(0, 14))
+        svc_date = now - DAY * randint(0, 14)
         segments.append(("DTP", "291", "D8", date_str(svc_date)))
 
         # Inquire about 1-4 service types per subscriber
-        num_eq = random.randint(1, 4)
-        for svc_code in random.sample(service_type_pool, num_eq):
+        num_eq = randint(1, 4)
+        for svc_code in sample(ELIGIBILITY_SERVICE_TYPES, num_eq):
             segments.append(("EQ", svc_code))
 
-    sender_id = facility.replace(" ", "")[:15]
-    receiver_id = payer_name.replace(" ", "")[:15]
+    sender_id = interchange_id(facility)
+    receiver_id = interchange_id(payer_name)
     return segments, sender_id, receiver_id
 
 
@@ -1190,48 +1354,24 @@ def generate_270(num_claims=None):
 # 271 — Eligibility Response
 # ---------------------------------------------------------------------------
 
-def generate_271(num_claims=None):
+def generate_271(num_claims=None, now=None, rng=random):
     """Generate eligibility responses (271) for multiple subscribers."""
-    num_subscribers = num_claims or random.randint(3, 10)
-
-    payer_name, payer_id = random.choice(PAYER_NAMES)
-    facility = random.choice(active_facility_names)
-    provider_npi = npi()
+    choice, randint, sample, rand = (
+        rng.choice, rng.randint, rng.sample, rng.random)
+    num_subscribers = num_claims or randint(3, 10)
+    now = now or datetime.now()
 
-    plan_names = [
-        "WC PREFERRED PLAN", "WORKERS COMP STANDARD",
-        "WC MANAGED CARE GOLD", "EMPLOYERS WC PLAN A",
-        "WC COMPREHENSIVE", "WC SELECT NETWORK",
-    ]
-
-    # Benefit detail templates - service types and their typical benefit info
-    benefit_details = [
-        # (service_type_code, description, info_type, amount_qualifier, amount)
-        ("1",  "Medical Care",      "B", "27", None),   # copay varies
-        ("33", "Chiropractic",      "B", "27", None),
-        ("35", "Dental Care",       "B", "27", None),
-        ("47", "Hospital",          "B", "29", None),   # percentage
-        ("86", "Emergency",         "B", "27", None),
-        ("88", "Pharmacy",          "B", "27", None),
-        ("98", "Physician Visit",   "B", "27", None),
-        ("AL", "Vision",            "B", "27", None),
-        ("MH", "Mental Health",     "B", "27", None),
-        ("UC", "Urgent Care",       "B", "27", None),
-        ("A4", "Psychiatric",       "B", "27", None),
-        ("A6", "Psychotherapy",     "B", "27", None),
-        ("AJ", "Alcoholism",        "F", "",   None),   # deductible
-        ("AK", "Drug Addiction",    "F", "",   None),
-        ("PT", "Physical Therapy",  "B", "27", None),
-        ("OT", "Occupational Therapy", "B", "27", None),
-    ]
+    payer_name, payer_id = choice(PAYER_NAMES)
+    facility = choice(active_facility_names)
+    provider_npi = npi(rng)
 
     segments = []
     hl_id = 0
 
     # BHT
     segments.append(("BHT", "0022", "11",
-                     "".join(random.choices(string.digits, k=8)),
-                     date_str(), time_str()))
+                     digit_string(8, rng),
+                     date_str(now), time_str(now)))
 
     # HL - Information Source (Payer)
     hl_id += 1
@@ -1246,14 +1386,14 @@ def generate_271(num_claims=None):
     segments.append(("NM1", "1P", "2", facility, "", "", "", "", "XX", provider_npi))
 
     for _ in range(num_subscribers):
-        patient = random_patient()
-        patient_addr = random_address()
-        pat_member = member_id()
-        plan_name = random.choice(plan_names)
+        patient = random_patient(rng)
+        patient_addr = random_address(rng)
+        pat_member = member_id(rng)
+        plan_name = choice(PLAN_NAMES)
 
         hl_id += 1
         segments.append(("HL", str(hl_id), str(provider_hl), "22", "0"))
-        trace_num = "".join(random.choices(string.digits, k=12))
+        trace_num = digit_string(12, rng)
         segments.append(("TRN", "2", trace_num, "9" + payer_id))
 
         # NM1 - Subscriber
@@ -1267,29 +1407,29 @@ def generate_271(num_claims=None):
         segments.append(("INS", "Y", "18", "", "", "A"))
 
         # DTP - Plan dates
-        eff_date = datetime.now() - timedelta(days=random.randint(30, 730))
+        eff_date = now - DAY * randint(30, 730)
         segments.append(("DTP", "346", "D8", date_str(eff_date)))
 
         # Randomly decide if subscriber is active or inactive
-        is_active = random.random() < 0.85  # 85% active
+        is_active = rand() < 0.85  # 85% active
 
         if is_active:
             # EB - Active coverage
             segments.append(("EB", "1", "", "30", "", plan_name))
 
             # EB - Individual benefits for several service types
-            num_benefits = random.randint(4, 10)
-            selected_benefits = random.sample(benefit_details, num_benefits)
-            all_svc_codes = "^".join(b[0] for b in selected_benefits)
+            num_benefits = randint(4, 10)
+            selected_benefits = sample(BENEFIT_DETAILS, num_benefits)
+            all_svc_codes = "^".join([b[0] for b in selected_benefits])
 
             # EB - Covered services list
             segments.append(("EB", "1", "", all_svc_codes))
 
             for svc_code, svc_desc, info_type, amt_qual, _ in selected_benefits:
-                copay = random.choice([10, 15, 20, 25, 30, 35, 40, 50])
+                copay = choice(COPAY_AMOUNTS)
                 if info_type == "B":  # Co-Payment
                     segments.append(("EB", "B", "IND", svc_code,
-                                     "HM", plan_name, amt_qual, str(copay),
+                                     "HM", plan_name, amt_qual, copay,
                                      "", "", "", "", "Y"))
                 elif info_type == "F":  # Limitations
                     segments.append(("EB", "F", "IND", svc_code,
@@ -1297,29 +1437,29 @@ def generate_271(num_claims=None):
 
                 # Add per-visit/per-year limits for therapy types
                 if svc_code in ("PT", "OT", "33"):
-                    max_visits = random.choice([12, 20, 24, 30, 36, 52, 60])
+                    max_visits = choice(VISIT_LIMITS)
                     segments.append(("EB", "F", "IND", svc_code,
                                      "HM", plan_name, "27", "",
-                                     "", str(max_visits), "23"))
+                                     "", max_visits, "23"))
 
             # EB - Out-of-pocket maximum
-            oop_max = random.choice([2000, 3000, 4000, 5000, 6000])
+            oop_max = choice(OOP_MAXIMUMS)
             segments.append(("EB", "G", "IND", "30", "HM", plan_name,
-                             "29", str(oop_max)))
+                             "29", oop_max))
 
             # EB - Deductible
-            deductible = random.choice([0, 250, 500, 750, 1000])
-            if deductible > 0:
+            deductible = choice(DEDUCTIBLES)
+            if deductible != "0":
                 segments.append(("EB", "C", "IND", "30", "HM", plan_name,
-                                 "29", str(deductible)))
+                                 "29", deductible))
         else:
             # EB - Inactive coverage
             segments.append(("EB", "6", "", "30", "", plan_name))
-            term_date = datetime.now() - timedelta(days=random.randint(1, 180))
+            term_date = now - DAY * randint(1, 180)
             segments.append(("DTP", "347", "D8", date_str(term_date)))
 
-    sender_id = payer_name.replace(" ", "")[:15]
-    receiver_id = facility.replace(" ", "")[:15]
+    sender_id = interchange_id(payer_name)
+    receiver_id = interchange_id(facility)
     return segments, sender_id, receiver_id
 
 
@@ -1327,26 +1467,23 @@ def generate_271(num_claims=None):
 # 278 — Health Care Services Review (Authorization Request)
 # ---------------------------------------------------------------------------
 
-def generate_278(num_claims=None):
+def generate_278(num_claims=None, now=None, rng=random):
     """Generate authorization requests (278) for multiple patients."""
-    num_requests = num_claims or random.randint(3, 8)
+    choice, randint, sample = rng.choice, rng.randint, rng.sample
+    num_requests = num_claims or randint(3, 8)
+    now = now or datetime.now()
 
-    payer_name, payer_id = random.choice(PAYER_NAMES)
-    mco_name, mco_code, mco_npi = random.choice(MANAGED_CARE_ORGS)
-    facility = random.choice(active_facility_names)
-
-    # Review types: HS=Health Services, SC=Specialty Care, AR=Admission Review
-    review_types = ["HS", "SC", "AR"]
-    # Certification types: I=Initial, R=Renewal/Recertification, E=Extension
-    cert_types = ["I", "I", "I", "R", "E"]
+    payer_name, payer_id = choice(PAYER_NAMES)
+    mco_name, mco_code, mco_npi = choice(MANAGED_CARE_ORGS)
+    facility = choice(active_facility_names)
 
     segments = []
     hl_id = 0
 
     # BHT - Beginning of Hierarchical Transaction
     segments.append(("BHT", "0007", "13",
-                     "".join(random.choices(string.digits, k=10)),
-                     date_str(), time_str()))
+                     digit_string(10, rng),
+                     date_str(now), time_str(now)))
 
     # HL - Utilization Management Organization (Payer/MCO)
     hl_id += 1
@@ -1354,64 +1491,69 @@ def generate_278(num_claims=None):
     segments.append(("HL", str(hl_id), "", "20", "1"))
     segments.append(("NM1", "X3", "2", mco_name, "", "", "", "", "46", mco_code))
 
+    # The active LOB pools (and their sizes) are fixed for the whole document
+    icd10_codes, procedure_codes = active_icd10_codes, active_procedure_codes
+    provider_names, auth_service_types = active_provider_names, active_auth_service_types
+    place_of_service = active_place_of_service
+    num_diag_codes = len(icd10_codes)
+    num_proc_codes = len(procedure_codes)
+
     for _ in range(num_requests):
-        patient = random_patient()
-        provider = random.choice(active_provider_names)
-        provider_npi_val = npi()
-        addr = random_address()
-        svc_type_code, svc_type_name, default_qty = random.choice(active_auth_service_types)
+        patient = random_patient(rng)
+        provider = choice(provider_names)
+        provider_npi_val = npi(rng)
+        addr = random_address(rng)
+        svc_type_code, svc_type_name, default_qty = choice(auth_service_types)
 
         # HL - Requester (Provider) — each request may come from a different provider
         hl_id += 1
         req_hl = hl_id
-        segments.append(("HL", str(hl_id), str(mco_hl), "21", "1"))
-        segments.append(("NM1", "1P", "1", provider[0], provider[1], provider[2],
-                         "", "", "XX", provider_npi_val))
-        segments.append(("REF", "EI", tax_id()))
-        segments.append(("N3", addr[0]))
-        segments.append(("N4", addr[1], addr[2], addr[3]))
-        segments.append(("PER", "IC", f"{provider[1]} {provider[0]}", "TE",
-                         f"555{random.randint(1000000,9999999)}"))
-
-        # HL - Subscriber
+        segments.extend((
+            ("HL", str(hl_id), str(mco_hl), "21", "1"),
+            ("NM1", "1P", "1", provider[0], provider[1], provider[2],
+             "", "", "XX", provider_npi_val),
+            ("REF", "EI", tax_id(rng)),
+            ("N3", addr[0]),
+            ("N4", addr[1], addr[2], addr[3]),
+            ("PER", "IC", f"{provider[1]} {provider[0]}", "TE", phone(rng=rng)),
+        ))
+
+        # HL - Subscriber, with the Patient Event HL beneath it
         hl_id += 1
         sub_hl = hl_id
-        pat_member = member_id()
-        patient_addr = random_address()
-        segments.append(("HL", str(hl_id), str(req_hl), "22", "1"))
-        segments.append(("NM1", "IL", "1", patient[0], patient[1], patient[2],
-                         "", "", "MI", pat_member))
-        segments.append(("N3", patient_addr[0]))
-        segments.append(("N4", patient_addr[1], patient_addr[2], patient_addr[3]))
-        segments.append(("DMG", "D8", patient[4], patient[3]))
-
-        # Payer
-        segments.append(("NM1", "PR", "2", payer_name, "", "", "", "", "PI", payer_id))
-
-        # HL - Patient Event
         hl_id += 1
-        segments.append(("HL", str(hl_id), str(sub_hl), "EV", "0"))
+        event_hl = hl_id
+        pat_member = member_id(rng)
+        patient_addr = random_address(rng)
+        segments.extend((
+            ("HL", str(sub_hl), str(req_hl), "22", "1"),
+            ("NM1", "IL", "1", patient[0], patient[1], patient[2],
+             "", "", "MI", pat_member),
+            ("N3", patient_addr[0]),
+            ("N4", patient_addr[1], patient_addr[2], patient_addr[3]),
+            ("DMG", "D8", patient[4], patient[3]),
+            # Payer
+            ("NM1", "PR", "2", payer_name, "", "", "", "", "PI", payer_id),
+            # HL - Patient Event
+            ("HL", str(event_hl), str(sub_hl), "EV", "0"),
+        ))
 
         # UM - Health Care Services Review Information
-        review_type = random.choice(review_types)
-        cert_type = random.choice(cert_types)
-        pos_code = random.choice(active_place_of_service)[0]
+        review_type = choice(REVIEW_TYPES)
+        cert_type = choice(CERT_TYPES)
+        pos_code = choice(place_of_service)[0]
         segments.append(("UM", review_type, cert_type, "", pos_code))
 
         # HI - Diagnosis (1-3 codes)
-        diag_codes = random.sample(active_icd10_codes,
-                                   min(random.randint(1, 3), len(active_icd10_codes)))
-        hi_elements = ["BK:" + diag_codes[0][0]]
-        for code, desc in diag_codes[1:]:
-            hi_elements.append("BF:" + code)
-        segments.append(("HI", *hi_elements))
+        diag_codes = sample(icd10_codes, min(randint(1, 3), num_diag_codes))
+        segments.append(("HI", diag_codes[0][2], *[dx[3] for dx in diag_codes[1:]]))
 
         # HSD - Requested visits/units
-        num_visits = random.randint(4, 36)
-        req_start = datetime.now() + timedelta(days=random.randint(1, 14))
-        req_end = req_start + timedelta(days=random.randint(30, 120))
-        segments.append(("HSD", "VS", str(num_visits), "DA",
-                         str((req_end - req_start).days), "7"))
+        num_visits = randint(4, 36)
+        req_start = now + DAY * randint(1, 14)
+        req_days = randint(30, 120)
+        req_end = req_start + DAY * req_days
+        segments.append(("HSD", "VS", str(num_visits), "DA", str(req_days), "7"))
 
         # DTP - Certification effective date range
         segments.append(("DTP", "472", "RD8",
@@ -1419,19 +1561,19 @@ def generate_278(num_claims=None):
 
         # REF - Previous authorization number (for renewals/extensions)
         if cert_type in ("R", "E"):
-            prev_auth = "AUTH" + "".join(random.choices(string.digits, k=8))
+            prev_auth = "AUTH" + digit_string(8, rng)
             segments.append(("REF", "BB", prev_auth))
 
         # SV1 - Service lines (1-3 procedures per request)
-        num_svc = min(random.randint(1, 3), len(active_procedure_codes))
-        procedures = random.sample(active_procedure_codes, num_svc)
-        for proc_cpt, proc_desc, proc_price in procedures:
-            qty = random.randint(1, num_visits)
-            segments.append(("SV1", f"HC:{proc_cpt}", f"{proc_price:.2f}",
+        num_svc = min(randint(1, 3), num_proc_codes)
+        procedures = sample(procedure_codes, num_svc)
+        for proc_cpt, proc_desc, proc_price, proc_price_str, proc_hc_code in procedures:
+            qty = randint(1, num_visits)
+            segments.append(("SV1", proc_hc_code, proc_price_str,
                              "UN", str(qty)))
 
-    sender_id = facility.replace(" ", "")[:15]
-    receiver_id = mco_name.replace(" ", "")[:15]
+    sender_id = interchange_id(facility)
+    receiver_id = interchange_id(mco_name)
     return segments, sender_id, receiver_id
 
 
@@ -1439,39 +1581,42 @@ def generate_278(num_claims=None):
 # 999 — Implementation Acknowledgment
 # ---------------------------------------------------------------------------
 
-def generate_999(num_claims=None):
+# Transaction sets a 999 may acknowledge, and their (GS01, GS08) from TXN_META
+ACK_TXN_TYPES = ("837", "835", "270", "278")
+ACK_META = {st_id: (func_code, gs_version)
+            for func_code, st_id, gs_version in TXN_META.values()
+            if st_id in ACK_TXN_TYPES}
+
+# Error codes for rejected segments (IK3/IK4)
+SEG_ERROR_CODES = [
+    ("1", "Unrecognized segment ID"),
+    ("2", "Unexpected segment"),
+    ("3", "Mandatory segment missing"),
+    ("5", "Segment exceeds maximum use"),
+    ("8", "Segment has data element errors"),
+]
+ELEM_ERROR_CODES = [
+    ("1", "Mandatory data element missing"),
+    ("2", "Conditional required data element missing"),
+    ("4", "Data element too short"),
+    ("5", "Data element too long"),
+    ("6", "Invalid character in data element"),
+    ("7", "Invalid code value"),
+]
+
+
+def generate_999(num_claims=None, now=None, rng=random):
     """Generate implementation acknowledgments (999) for multiple transaction sets."""
-    num_txns = num_claims or random.randint(5, 15)
+    choice, randint, rand = rng.choice, rng.randint, rng.random
+    num_txns = num_claims or randint(5, 15)
 
-    sender = random.choice(PAYER_NAMES)
-    receiver_facility = random.choice(active_facility_names)
-    orig_gs_control = control_number(4)
+    sender = choice(PAYER_NAMES)
+    receiver_facility = choice(active_facility_names)
+    orig_gs_control = control_number(4, rng)
 
     # Acknowledge a random healthcare transaction type
-    ack_txn = random.choice(["837", "835", "270", "278"])
-    func_code = {"837": "HC", "835": "HP", "270": "HS", "278": "HI"}[ack_txn]
-    version_map = {
-        "837": "005010X222A1", "835": "005010X221A1",
-        "270": "005010X279A1", "278": "005010X217",
-    }
-    gs_version = version_map[ack_txn]
-
-    # Error codes for rejected segments (IK3/IK4)
-    seg_error_codes = [
-        ("1", "Unrecognized segment ID"),
-        ("2", "Unexpected segment"),
-        ("3", "Mandatory segment missing"),
-        ("5", "Segment exceeds maximum use"),
-        ("8", "Segment has data element errors"),
-    ]
-    elem_error_codes = [
-        ("1", "Mandatory data element missing"),
-        ("2", "Conditional required data element missing"),
-        ("4", "Data element too short"),
-        ("5", "Data element too long"),
-        ("6", "Invalid character in data element"),
-        ("7", "Invalid code value"),
-    ]
+    ack_txn = choice(ACK_TXN_TYPES)
+    func_code, gs_version = ACK_META[ack_txn]
 
     segments = []
 
@@ -1482,13 +1627,13 @@ def generate_999(num_claims=None):
     rejected = 0
 
     for i in range(num_txns):
-        st_control = control_number(4).zfill(4)
+        st_control = control_number(4, rng)
 
         # AK2 - Transaction Set Response Header
         segments.append(("AK2", ack_txn, st_control, gs_version))
 
         # Randomly decide status: ~70% accepted, ~15% accepted w/ errors, ~15% rejected
-        roll = random.random()
+        roll = rand()
         if roll < 0.70:
             status = "A"  # Accepted
             accepted += 1
@@ -1496,30 +1641,30 @@ def generate_999(num_claims=None):
             status = "E"  # Accepted with Errors
             accepted += 1
             # Add 1-2 segment error notes
-            for _ in range(random.randint(1, 2)):
-                seg_pos = random.randint(3, 25)
-                seg_id = random.choice(["NM1", "CLM", "SV1", "DTP", "REF",
-                                        "SBR", "DMG", "HI", "HL", "CLP"])
-                err_code, err_desc = random.choice(seg_error_codes)
-                segments.append(("IK3", seg_id, str(seg_pos), "", err_code))
+            for _ in range(randint(1, 2)):
+                seg_pos = randint(3, 25)
+                seg_id = choice(("NM1", "CLM", "SV1", "DTP", "REF",
+                                 "SBR", "DMG", "HI", "HL", "CLP"))
+                err_code, err_desc = choice(SEG_ERROR_CODES)
                 # IK4 - element-level error detail
-                elem_pos = random.randint(1, 10)
-                e_code, e_desc = random.choice(elem_error_codes)
-                segments.append(("IK4", str(elem_pos), "", "", e_code))
+                elem_pos = randint(1, 10)
+                e_code, e_desc = choice(ELEM_ERROR_CODES)
+                segments.extend((("IK3", seg_id, str(seg_pos), "", err_code),
+                                 ("IK4", str(elem_pos), "", "", e_code)))
         else:
             status = "R"  # Rejected
             rejected += 1
             # Add 2-4 error notes for rejected transactions
-            for _ in range(random.randint(2, 4)):
-                seg_pos = random.randint(3, 30)
-                seg_id = random.choice(["NM1", "CLM", "SV1", "DTP", "REF",
-                                        "SBR", "DMG", "HI", "HL", "CLP",
-                                        "N3", "N4", "PER", "BHT"])
-                err_code, err_desc = random.choice(seg_error_codes)
-                segments.append(("IK3", seg_id, str(seg_pos), "", err_code))
-                elem_pos = random.randint(1, 12)
-                e_code, e_desc = random.choice(elem_error_codes)
-                segments.append(("IK4", str(elem_pos), "", "", e_code))
+            for _ in range(randint(2, 4)):
+                seg_pos = randint(3, 30)
+                seg_id = choice(("NM1", "CLM", "SV1", "DTP", "REF",
+                                 "SBR", "DMG", "HI", "HL", "CLP",
+                                 "N3", "N4", "PER", "BHT"))
+                err_code, err_desc = choice(SEG_ERROR_CODES)
+                elem_pos = randint(1, 12)
+                e_code, e_desc = choice(ELEM_ERROR_CODES)
+                segments.extend((("IK3", seg_id, str(seg_pos), "", err_code),
+                                 ("IK4", str(elem_pos), "", "", e_code)))
 
         # IK5 - Transaction Set Response Trailer
         segments.append(("IK5", status))
@@ -1529,8 +1674,8 @@ def generate_999(num_claims=None):
     group_status = "A" if rejected == 0 else ("P" if accepted > 0 else "R")
     segments.append(("AK9", group_status, str(total), str(total), str(accepted)))
 
-    sender_id = sender[0].replace(" ", "")[:15]
-    receiver_id = receiver_facility.replace(" ", "")[:15]
+    sender_id = interchange_id(sender[0])
+    receiver_id = interchange_id(receiver_facility)
     return segments, sender_id, receiver_id
 
 
@@ -1548,18 +1693,31 @@ GENERATORS = {
 }
 
 
-def generate_edi(txn_type, num_claims=None, pretty=False):
-    """Generate a complete EDI document for the given transaction type."""
-    if txn_type not in GENERATORS:
+def build_edi(txn_type, num_claims=None, rng=random):
+    """Build an enveloped EDIBuilder for the given transaction type.
+
+    All random data is drawn from ``rng``; pass a seeded ``random.Random``
+    for output that does not depend on (or disturb) the global generator.
+    """
+    entry = GENERATORS.get(txn_type)
+    if entry is None:
         raise ValueError(f"Unsupported transaction type: {txn_type}. "
                          f"Supported: {', '.join(GENERATORS.keys())}")
 
-    generator, description = GENERATORS[txn_type]
-    body_segments, sender_id, receiver_id = generator(num_claims)
+    generator, description = entry
+    now = datetime.now()
+    body_segments, sender_id, receiver_id = generator(num_claims, now, rng)
 
     builder = EDIBuilder()
-    build_envelope(builder, sender_id, receiver_id, txn_type, body_segments)
+    build_envelope(builder, sender_id, receiver_id, txn_type, body_segments,
+                   now, rng)
+
+    return builder, description
+
 
+def generate_edi(txn_type, num_claims=None, pretty=False, rng=random):
+    """Generate a complete EDI document for the given transaction type."""
+    builder, description = build_edi(txn_type, num_claims, rng)
     return builder.render(pretty=pretty), description
 
 
@@ -1567,6 +1725,23 @@ def generate_edi(txn_type, num_claims=None, pretty=False):
 # CLI
 # ---------------------------------------------------------------------------
 
+def write_sample(txn_type, filepath, num_claims=None, pretty=False,
+                 seed=None, lob=None):
+    """Generate one transaction type and write it to ``filepath``.
+
+    Used for each file in ``--type all``. It seeds its own generator per
+    transaction type and re-applies the LOB itself so the result is the same
+    whether it runs in the main process or in a ``--jobs`` worker.
+    """
+    rng = random.Random(f"{seed}:{txn_type}") if seed is not None else random
+    apply_lob(lob)
+
+    builder, desc = build_edi(txn_type, num_claims, rng)
+    with open(filepath, "wb") as f:
+        builder.write_to(f, pretty)
+    return desc
+
+
 def main():
     all_types = list(GENERATORS.keys())
     choices = all_types + ["all"]
@@ -1611,6 +1786,7 @@ Examples:
   %(prog)s --type 278 --lob PT --claims 10 --pretty
   %(prog)s --type all --output-dir ./samples
   %(prog)s --type all --lob DX --output-dir ./dx_samples
+  %(prog)s --type all --jobs 4 --claims 500 --output-dir ./load
         """,
     )
     parser.add_argument(
@@ -1642,39 +1818,50 @@ Examples:
         choices=lob_choices, type=str.upper,
         help="Limit data to a specific line of business (e.g. PT, DX, DME).",
     )
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1,
+        help="Worker processes for 'all' mode (default: 1, no workers).",
+    )
 
     args = parser.parse_args()
 
-    if args.seed is not None:
-        random.seed(args.seed)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    rng = random.Random(args.seed) if args.seed is not None else random
 
     apply_lob(args.lob)
 
     if args.type == "all":
         output_dir = args.output_dir or "."
         os.makedirs(output_dir, exist_ok=True)
-        for txn_type in GENERATORS:
-            content, desc = generate_edi(txn_type, args.claims, args.pretty)
-            filename = f"sample_{txn_type}.edi"
-            filepath = os.path.join(output_dir, filename)
-            with open(filepath, "w") as f:
-                f.write(content)
-                if args.pretty:
-                    f.write("\n")
-            print(f"Generated {txn_type} ({desc}): {filepath}")
+        tasks = [(txn_type, os.path.join(output_dir, f"sample_{txn_type}.edi"))
+                 for txn_type in GENERATORS]
+        options = (args.claims, args.pretty, args.seed, args.lob)
+        if args.jobs > 1:
+            with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+                futures = [pool.submit(write_sample, txn_type, filepath, *options)
+                           for txn_type, filepath in tasks]
+                descs = [future.result() for future in futures]
+        else:
+            descs = [write_sample(txn_type, filepath, *options)
+                     for txn_type, filepath in tasks]
+        sys.stdout.writelines(
+            f"Generated {txn_type} ({desc}): {filepath}\n"
+            for (txn_type, filepath), desc in zip(tasks, descs))
         return
 
-    content, desc = generate_edi(args.type, args.claims, args.pretty)
-
     if args.output:
-        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
-        with open(args.output, "w") as f:
-            f.write(content)
-            if args.pretty:
-                f.write("\n")
-        print(f"Generated {args.type} ({desc}): {args.output}")
+        builder, desc = build_edi(args.type, args.claims, rng)
+        parent = os.path.dirname(args.output)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(args.output, "wb") as f:
+            builder.write_to(f, args.pretty)
+        sys.stdout.write(f"Generated {args.type} ({desc}): {args.output}\n")
     else:
-        print(content)
+        content, desc = generate_edi(args.type, args.claims, args.pretty, rng)
+        sys.stdout.write(content + "\n")
 
 
 if __name__ == "__main__":